@@ -1,11 +1,19 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import json
+from flask_compress import Compress
+import orjson
 import logging
-import numpy as np
+import os
 import csv
 import io
+import re
+import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 
 # Import custom modules
 from strategy_manager import StrategyManager
@@ -18,12 +26,57 @@ from indicators import Indicators
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+# numpy scalars/arrays are encoded natively by orjson; non-string keys are stringified like stdlib json does
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(obj):
+    """Fallback for objects orjson cannot encode natively"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that parses and serializes with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        # orjson accepts both bytes and str, so the raw request body is parsed without decoding first
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Compress JSON responses for clients that accept it; tiny bodies are not worth the CPU
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
 
 # Configure CORS to accept requests from both localhost and GitHub Codespaces domains
-CORS(app, resources={r"/*": {"origins": ["http://localhost:3000", "https://*.github.dev", "https://*.app.github.dev", "*"]}})
-# The wildcard is kept for backward compatibility, but explicit domains are better
+# Precompiled patterns let flask_cors match Codespaces origins directly instead of converting globs per request.
+# flask_cors compares plain strings case-insensitively but uses compiled patterns as given, hence IGNORECASE.
+CORS_ORIGINS = [
+    "http://localhost:3000",
+    re.compile(r"^https://.*\.github\.dev$", re.IGNORECASE),
+    re.compile(r"^https://.*\.app\.github\.dev$", re.IGNORECASE),
+]
+
+CORS(app, resources={r"/*": {"origins": CORS_ORIGINS}})
+
 
 # Initialize components
 strategy_manager = StrategyManager()
@@ -33,13 +86,145 @@ backtest_engine = BacktestEngine(data_provider)
 optimizer = Optimizer(backtest_engine)
 indicators = Indicators()
 
+# (second, ISO string) pair so polled endpoints format the timestamp at most once per second
+_iso_now_cache = (0, '')
+
+
+def _iso_now():
+    """Return the current local time in ISO format, cached at one-second granularity"""
+    global _iso_now_cache
+    now = int(time.time())
+    cached_second, cached_iso = _iso_now_cache
+    if cached_second != now:
+        cached_iso = datetime.fromtimestamp(now).isoformat()
+        # A single tuple assignment keeps the update safe across request threads
+        _iso_now_cache = (now, cached_iso)
+    return cached_iso
+
+
+# The backtest API only accepts YYYY-MM-DD, so dates are matched directly instead of through strptime
+_DATE_RE = re.compile(r'([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})')
+
+
+def _parse_ymd(value):
+    """Parse a YYYY-MM-DD date string, raising ValueError if it is malformed or not a real date"""
+    match = _DATE_RE.fullmatch(value)
+    if not match:
+        raise ValueError(f"time data {value!r} does not match format '%Y-%m-%d'")
+    year, month, day = map(int, match.groups())
+    return datetime(year, month, day)
+
+
+def _drain(buffer):
+    """Return the text accumulated in a StringIO buffer as UTF-8 bytes and reset it"""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data.encode('utf-8')
+
+
+# Fixed rows of the optimization CSV report, pre-encoded in csv.writer's default dialect
+_CSV_REPORT_TITLE = b"Trading Strategy Hyper-Tuner - Optimization Report\r\n"
+_CSV_COMPARISON_TITLE = b"PERFORMANCE COMPARISON\r\n"
+_CSV_COMPARISON_COLUMNS = b"Metric,Original,Optimized,Improvement,Improvement (%)\r\n"
+_CSV_PARAMETERS_HEADER = b"OPTIMIZED PARAMETERS\r\nParameter,Value\r\n"
+_CSV_DETAILS_TITLE = b"\r\nOPTIMIZATION DETAILS\r\n"
+_CSV_ITERATIONS_HEADER = b"\r\nITERATION RESULTS\r\nIteration,Objective Value,Best So Far\r\n"
+
+
+def _lenient_json_default(obj):
+    """orjson fallback for debug output: arrays and frames become lists/dicts, anything else its string form"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+
+def _summarize(metrics):
+    """Stringify every value of a metrics dict for debug output; None if it is not a dict"""
+    if not isinstance(metrics, dict):
+        return None
+    return dict(zip(metrics, map(str, metrics.values())))
+
+
+class _LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry once it holds maxsize entries"""
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Last serialized optimization_status body per optimization, tagged with the state it was built from
+_status_cache = _LRUCache(maxsize=64)
+
+
+def _status_cache_key(record):
+    """Fingerprint of the optimization record fields that change between status polls"""
+    return (record.get('status'), record.get('progress'), len(record.get('iteration_results') or ()))
+
+
+def _if_none_match(etag):
+    """True if If-None-Match names etag, allowing the ':<encoding>' suffix flask-compress adds to compressed ETags"""
+    return any(
+        tag == etag or tag.startswith(etag + ':')
+        for tag in request.if_none_match.as_set(include_weak=True)
+    )
+
+
+# Same idea for debug_optimization_results; the key also counts record fields, which grow as results land
+_debug_results_cache = _LRUCache(maxsize=16)
+
+
+def _status_etag(cache_key):
+    """ETag for an optimization_status body; statuses like 'running iteration' contain spaces, which ETags may not"""
+    return '-'.join(map(str, cache_key)).replace(' ', '_')
+
+
+# Encoded CSV reports for completed optimizations, keyed by optimization ID; reports can be large, so keep few
+_csv_report_cache = _LRUCache(maxsize=8)
+
+
+@lru_cache(maxsize=1024)
+def _param_display_name(param_name):
+    """Readable label for an optimizer parameter name such as entry_0_RSI_threshold"""
+    lowered = param_name.lower()
+    if 'threshold' in lowered:
+        suffix = 'threshold'
+    elif '_period' in lowered or 'timeperiod' in lowered:
+        suffix = 'period'
+    else:
+        return param_name
+    
+    # Names are <entry|exit>_<index>_<indicator>_<param>
+    parts = param_name.split('_')
+    condition_type = 'Entry' if parts[0] == 'entry' else 'Exit'
+    indicator_name = parts[2] if len(parts) > 2 else 'indicator'
+    return f"{condition_type} {indicator_name} {suffix}"
+
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy", 
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _iso_now(),
         "data_provider": provider_factory.get_provider_name()
     })
 
@@ -61,21 +246,13 @@ def test_connection():
     """Simple test endpoint to verify connectivity"""
     # Include useful diagnostics
     try:
-        # Get request headers for diagnostics
-        headers = dict(request.headers)
-        # Remove sensitive headers
-        if 'Cookie' in headers:
-            headers['Cookie'] = '[REDACTED]'
-        if 'Authorization' in headers:
-            headers['Authorization'] = '[REDACTED]'
-            
-        # Return detailed connectivity information
+        # Return detailed connectivity information (only the headers reported here are read)
         return jsonify({
             "success": True, 
             "message": "Backend API is reachable",
             "backend_info": {
                 "data_provider": provider_factory.get_provider_name(),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _iso_now(),
                 "talib_version": indicators.talib_version if hasattr(indicators, 'talib_version') else 'Unknown'
             },
             "request_info": {
@@ -116,7 +293,7 @@ def run_backtest():
         try:
             strategy = strategy_manager.get_strategy(strategy_id)
         except Exception as strat_err:
-            logger.error(f"Error retrieving strategy {strategy_id}: {str(strat_err)}")
+            logger.error("Error retrieving strategy %s: %s", strategy_id, strat_err)
             return jsonify({"success": False, "error": f"Could not retrieve strategy: {str(strat_err)}"}), 404
         
         # Validate backtest parameters
@@ -130,17 +307,19 @@ def run_backtest():
         
         try:
             # Validate dates format
-            datetime.strptime(start_date, '%Y-%m-%d')
-            datetime.strptime(end_date, '%Y-%m-%d')
+            _parse_ymd(start_date)
+            _parse_ymd(end_date)
         except ValueError as date_err:
-            logger.error(f"Invalid date format: {str(date_err)}")
+            logger.error("Invalid date format: %s", date_err)
             return jsonify({"success": False, "error": f"Invalid date format. Use YYYY-MM-DD format: {str(date_err)}"}), 400
         
         # Run backtest with enhanced error handling
         try:
-            logger.info(f"Running backtest for strategy {strategy_id} from {start_date} to {end_date}")
-            logger.debug(f"Strategy: {strategy}")
-            logger.debug(f"Using data provider: {type(data_provider).__name__}")
+            logger.info("Running backtest for strategy %s from %s to %s", strategy_id, start_date, end_date)
+            # The strategy dump is only worth formatting when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Strategy: %s", strategy)
+                logger.debug("Using data provider: %s", type(data_provider).__name__)
             
             backtest_results = backtest_engine.run_backtest(
                 strategy, 
@@ -152,7 +331,7 @@ def run_backtest():
             # Save backtest results
             strategy_manager.save_backtest_results(strategy_id, backtest_results)
             
-            logger.info(f"Backtest completed successfully for strategy {strategy_id}")
+            logger.info("Backtest completed successfully for strategy %s", strategy_id)
             return jsonify({
                 "success": True, 
                 "backtest_id": backtest_results["backtest_id"],
@@ -167,7 +346,7 @@ def run_backtest():
             elif "No 'close' price data found" in error_message:
                 error_message = "Unable to retrieve price data. Please check the symbol and try again."
             
-            logger.error(f"Backtest error: {error_message}")
+            logger.error("Backtest error: %s", error_message)
             return jsonify({"success": False, "error": error_message}), 400
         except Exception as bt_err:
             error_message = str(bt_err)
@@ -179,7 +358,7 @@ def run_backtest():
             elif "object has no attribute 'sma'" in error_message:
                 error_message = "Indicator error: Could not apply SMA indicator properly to the data. The data structure from Yahoo Finance may need additional processing. Try running the backtest again."
             
-            logger.error(f"Error running backtest ({error_type}): {error_message}")
+            logger.error("Error running backtest (%s): %s", error_type, error_message)
             return jsonify({
                 "success": False, 
                 "error": f"Backtest engine error: {error_message}",
@@ -187,7 +366,7 @@ def run_backtest():
             }), 400
             
     except Exception as e:
-        logger.error(f"Unexpected error running backtest: {str(e)}")
+        logger.error("Unexpected error running backtest: %s", e)
         return jsonify({"success": False, "error": f"Server error: {str(e)}"}), 500
 
 
@@ -210,8 +389,7 @@ def run_optimization():
         
         # Get strategy and original backtest results
         try:
-            strategy = strategy_manager.get_strategy(strategy_id)
-            original_backtest = strategy_manager.get_backtest_results(strategy_id, backtest_id)
+            strategy, original_backtest = strategy_manager.get_strategy_with_backtest(strategy_id, backtest_id)
         except Exception as e:
             logger.error(f"Error retrieving strategy or backtest data: {str(e)}")
             return jsonify({"success": False, "error": f"Failed to retrieve data: {str(e)}"}), 400
@@ -245,18 +423,33 @@ def run_optimization():
 def optimization_status(optimization_id):
     """Get the status of an ongoing optimization process"""
     try:
-        logger.info(f"Received request for optimization status: {optimization_id}")
+        logger.info("Received request for optimization status: %s", optimization_id)
         
         # Check if optimization exists
-        if optimization_id not in optimizer.optimizations:
-            logger.error(f"Optimization with ID {optimization_id} not found")
+        record = optimizer.optimizations.get(optimization_id)
+        if record is None:
+            logger.error("Optimization with ID %s not found", optimization_id)
             return jsonify({"success": False, "error": f"Optimization with ID {optimization_id} not found"}), 404
         
+        # Reuse the previous body if nothing has changed since the last poll
+        cache_key = _status_cache_key(record)
+        etag = _status_etag(cache_key)
+        if _if_none_match(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        cached = _status_cache.get(optimization_id)
+        if cached is not None and cached[0] == cache_key:
+            response = app.response_class(cached[1], mimetype='application/json')
+            response.set_etag(etag)
+            return response
+        
         # Get optimization status
         status = optimizer.get_optimization_status(optimization_id)
         
         # Log basic status information
-        logger.info(f"Status: {status.get('status')}, Progress: {status.get('progress')}%, Iterations: {len(status.get('iteration_results', []))}")
+        logger.info("Status: %s, Progress: %s%%, Iterations: %s", status.get('status'), status.get('progress'), len(status.get('iteration_results', [])))
         
         # Create a simplified status object that's guaranteed to be serializable
         safe_status = {
@@ -274,19 +467,9 @@ def optimization_status(optimization_id):
                 }
                 safe_status['iteration_results'].append(safe_result)
         
-        # Add best parameters if available
+        # Add best parameters if available (numpy scalars are handled by the JSON provider)
         if 'best_params' in status and status['best_params']:
-            safe_status['best_params'] = {}
-            for key, value in status['best_params'].items():
-                if isinstance(value, (int, float, str, bool)) or value is None:
-                    safe_status['best_params'][key] = value
-                elif hasattr(value, 'item'):  # Handle numpy types
-                    try:
-                        safe_status['best_params'][key] = value.item()
-                    except:
-                        safe_status['best_params'][key] = float(value) if isinstance(value, (np.floating, np.float64, np.float32)) else int(value)
-                else:
-                    safe_status['best_params'][key] = str(value)
+            safe_status['best_params'] = dict(status['best_params'])
         
         # Add best result if available
         if 'best_result' in status and status['best_result'] is not None:
@@ -296,33 +479,11 @@ def optimization_status(optimization_id):
         if status.get('status') == 'completed' and 'comparison' in status and status['comparison']:
             safe_status['comparison'] = {}
             
-            # Process original metrics
+            # Original and optimized metrics are passed through as-is
             if 'original' in status['comparison']:
-                safe_status['comparison']['original'] = {}
-                for key, value in status['comparison']['original'].items():
-                    if isinstance(value, (int, float, str, bool)) or value is None:
-                        safe_status['comparison']['original'][key] = value
-                    elif hasattr(value, 'item'):  # Handle numpy types
-                        try:
-                            safe_status['comparison']['original'][key] = value.item()
-                        except:
-                            safe_status['comparison']['original'][key] = float(value) if isinstance(value, (np.floating, np.float64, np.float32)) else int(value)
-                    else:
-                        safe_status['comparison']['original'][key] = str(value)
-            
-            # Process optimized metrics
+                safe_status['comparison']['original'] = dict(status['comparison']['original'])
             if 'optimized' in status['comparison']:
-                safe_status['comparison']['optimized'] = {}
-                for key, value in status['comparison']['optimized'].items():
-                    if isinstance(value, (int, float, str, bool)) or value is None:
-                        safe_status['comparison']['optimized'][key] = value
-                    elif hasattr(value, 'item'):  # Handle numpy types
-                        try:
-                            safe_status['comparison']['optimized'][key] = value.item()
-                        except:
-                            safe_status['comparison']['optimized'][key] = float(value) if isinstance(value, (np.floating, np.float64, np.float32)) else int(value)
-                    else:
-                        safe_status['comparison']['optimized'][key] = str(value)
+                safe_status['comparison']['optimized'] = dict(status['comparison']['optimized'])
         
         # Ensure all needed keys for frontend are present
         if 'comparison' not in safe_status and status.get('status') == 'completed':
@@ -331,23 +492,64 @@ def optimization_status(optimization_id):
                 'optimized': {}
             }
         
-        # Try to serialize to verify it's OK
+        # Serialize once; the same bytes are both the check and the response body
         try:
-            import json
-            json_str = json.dumps({"success": True, "status": safe_status})
-            logger.info(f"Successfully serialized status with length {len(json_str)}")
+            json_bytes = orjson.dumps({"success": True, "status": safe_status}, default=_orjson_default, option=ORJSON_OPTIONS)
+            logger.info("Successfully serialized status with length %s", len(json_bytes))
         except Exception as e:
-            logger.error(f"Failed to serialize status: {str(e)}")
+            logger.error("Failed to serialize status: %s", e)
             return jsonify({"success": False, "error": "Failed to serialize optimization status"}), 500
         
-        return jsonify({"success": True, "status": safe_status})
+        _status_cache[optimization_id] = (cache_key, json_bytes)
+        response = app.response_class(json_bytes, mimetype='application/json')
+        response.set_etag(etag)
+        return response
     except Exception as e:
-        logger.error(f"Error getting optimization status: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error getting optimization status: %s", e)
         return jsonify({"success": False, "error": str(e)}), 400
 
 
+# Last resort indicator list for when even the default indicator table cannot be built
+_MINIMAL_INDICATORS = {
+    "SMA": {
+        "display_name": "Simple Moving Average (SMA)",
+        "description": "Average price over a specified period",
+        "category": "Overlap Studies",
+        "params": ["value", "timeperiod"],
+        "code_name": "SMA"
+    },
+    "EMA": {
+        "display_name": "Exponential Moving Average (EMA)",
+        "description": "Weighted moving average giving more importance to recent prices",
+        "category": "Overlap Studies",
+        "params": ["value", "timeperiod"],
+        "code_name": "EMA"
+    },
+    "RSI": {
+        "display_name": "Relative Strength Index (RSI)",
+        "description": "Momentum oscillator measuring speed and change of price movements (0-100)",
+        "category": "Momentum Indicators",
+        "params": ["value", "timeperiod"],
+        "code_name": "RSI"
+    }
+}
+
+
+@lru_cache(maxsize=None)
+def _fallback_indicators():
+    """Default indicators reduced to the fields the frontend needs; built once, and retried if it raises"""
+    return {
+        name: {
+            'display_name': info.get('display_name', name),
+            'description': info.get('description', ''),
+            'category': info.get('category', 'Other'),
+            'params': info.get('params', ['value', 'timeperiod']),
+            'code_name': info.get('code_name', name)
+        }
+        for name, info in indicators._get_default_indicators().items()
+    }
+
+
 @app.route('/api/get-available-indicators', methods=['GET'])
 def get_available_indicators():
     """Get list of available technical indicators"""
@@ -357,67 +559,32 @@ def get_available_indicators():
         logger.info(f"Successfully retrieved {len(indicator_list)} indicators")
         return jsonify({"success": True, "indicators": indicator_list})
     except Exception as e:
-        logger.error(f"Error getting indicators: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error getting indicators: %s", e)
         
         # Return a minimal successful response with default indicators
         # This is better than failing completely
         try:
-            default_indicators = indicators._get_default_indicators()
-            # Sanitize the default indicators format
-            simplified_indicators = {}
-            for name, info in default_indicators.items():
-                simplified_indicators[name] = {
-                    'display_name': info.get('display_name', name),
-                    'description': info.get('description', ''),
-                    'category': info.get('category', 'Other'),
-                    'params': info.get('params', ['value', 'timeperiod']),
-                    'code_name': info.get('code_name', name)
-                }
+            simplified_indicators = _fallback_indicators()
             logger.info(f"Falling back to {len(simplified_indicators)} default indicators")
             return jsonify({"success": True, "indicators": simplified_indicators})
         except Exception as fallback_error:
             logger.error(f"Error creating fallback indicators: {str(fallback_error)}")
             # Last resort minimal response with essential indicators
-            minimal_indicators = {
-                "SMA": {
-                    "display_name": "Simple Moving Average (SMA)",
-                    "description": "Average price over a specified period",
-                    "category": "Overlap Studies",
-                    "params": ["value", "timeperiod"],
-                    "code_name": "SMA"
-                },
-                "EMA": {
-                    "display_name": "Exponential Moving Average (EMA)",
-                    "description": "Weighted moving average giving more importance to recent prices",
-                    "category": "Overlap Studies",
-                    "params": ["value", "timeperiod"],
-                    "code_name": "EMA"
-                },
-                "RSI": {
-                    "display_name": "Relative Strength Index (RSI)",
-                    "description": "Momentum oscillator measuring speed and change of price movements (0-100)",
-                    "category": "Momentum Indicators",
-                    "params": ["value", "timeperiod"],
-                    "code_name": "RSI"
-                }
-            }
-            return jsonify({"success": True, "indicators": minimal_indicators})
+            return jsonify({"success": True, "indicators": _MINIMAL_INDICATORS})
 
 
 @app.route('/api/debug/optimization-status/<optimization_id>', methods=['GET'])
 def debug_optimization_status(optimization_id):
     """Debug endpoint for troubleshooting optimization status serialization"""
     try:
-        logger.info(f"Debug request for optimization status: {optimization_id}")
+        logger.info("Debug request for optimization status: %s", optimization_id)
         
         # First try to get the real status
         try:
             status = optimizer.get_optimization_status(optimization_id)
-            logger.info(f"Retrieved actual optimization status for debugging")
+            logger.info("Retrieved actual optimization status for debugging")
         except Exception as e:
-            logger.error(f"Could not retrieve actual status: {str(e)}")
+            logger.error("Could not retrieve actual status: %s", e)
             # Create a simplified test status
             status = {
                 'status': 'completed',
@@ -434,47 +601,26 @@ def debug_optimization_status(optimization_id):
                     'optimized': {'returns': 7.8, 'win_rate': 0.75}
                 }
             }
-            logger.info(f"Created simplified test status for debugging")
+            logger.info("Created simplified test status for debugging")
         
-        # Try to serialize with default json
+        # Serialize in one orjson pass; values it cannot encode natively go through the lenient fallback
         try:
-            import json
-            json_str = json.dumps(status)
-            logger.info(f"Successfully serialized status with default JSON encoder")
-        except Exception as e:
-            logger.error(f"Default JSON serialization failed: {str(e)}")
-            
-            # Implement a custom JSON encoder to handle problematic types
-            class CustomEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, (np.integer, np.int64, np.int32)):
-                        return int(obj)
-                    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-                        return float(obj)
-                    elif isinstance(obj, np.ndarray):
-                        return obj.tolist()
-                    elif hasattr(obj, 'tolist'):
-                        return obj.tolist()
-                    elif hasattr(obj, 'to_dict'):
-                        return obj.to_dict()
-                    else:
-                        return str(obj)
-            
-            try:
-                json_str = json.dumps(status, cls=CustomEncoder)
-                logger.info(f"Successfully serialized status with custom JSON encoder")
-                status = json.loads(json_str)  # Convert back to ensure it's fully serializable
-            except Exception as e:
-                logger.error(f"Custom JSON serialization also failed: {str(e)}")
-                # Last resort: create a minimal valid response
-                status = {
+            payload = orjson.dumps({"success": True, "status": status}, default=_lenient_json_default, option=ORJSON_OPTIONS)
+            logger.info("Successfully serialized status with orjson")
+        except orjson.JSONEncodeError as e:
+            logger.error("JSON serialization failed: %s", e)
+            # Last resort: create a minimal valid response
+            payload = orjson.dumps({
+                "success": True,
+                "status": {
                     'status': 'error',
                     'message': 'Could not serialize the optimization status'
                 }
+            })
         
-        return jsonify({"success": True, "status": status})
+        return app.response_class(payload, mimetype='application/json')
     except Exception as e:
-        logger.error(f"Error in debug endpoint: {str(e)}")
+        logger.error("Error in debug endpoint: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -499,12 +645,11 @@ def save_optimized_strategy():
             logger.error(f"Could not retrieve original strategy: {str(e)}")
             return jsonify({"success": False, "error": f"Could not retrieve original strategy: {str(e)}"}), 404
         
-        # Get optimization data
-        if optimization_id not in optimizer.optimizations:
+        # Get optimization data; only status and best_params are read, so the live record is used without copying
+        optimization_status = optimizer.optimizations.get(optimization_id)
+        if optimization_status is None:
             logger.error(f"Optimization with ID {optimization_id} not found")
             return jsonify({"success": False, "error": f"Optimization with ID {optimization_id} not found"}), 404
-            
-        optimization_status = optimizer.get_optimization_status(optimization_id)
         
         if optimization_status.get('status') != 'completed' or 'best_params' not in optimization_status:
             logger.error("Optimization not completed or no best parameters available")
@@ -521,7 +666,7 @@ def save_optimized_strategy():
         )
         
         # Rename the strategy to indicate it's optimized
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         optimized_strategy['name'] = f"{strategy['name']}_optimized_{timestamp}"
         
         # Save as a new strategy
@@ -540,25 +685,8 @@ def save_optimized_strategy():
             if isinstance(optimized_value, float):
                 optimized_value = round(optimized_value, 4)
                 
-            # Extract a more readable name for threshold parameters
-            display_name = param_name
-            if 'threshold' in param_name.lower():
-                # Extract indicator name and type (entry/exit) for a more readable display
-                parts = param_name.split('_')
-                # Find the indicator part (typically at index 2)
-                indicator_name = parts[2] if len(parts) > 2 else 'indicator'
-                # Determine if it's entry or exit
-                condition_type = 'Entry' if parts[0] == 'entry' else 'Exit'
-                display_name = f"{condition_type} {indicator_name} threshold"
-            elif '_period' in param_name.lower() or 'timeperiod' in param_name.lower():
-                # Better naming for period parameters
-                parts = param_name.split('_')
-                condition_type = 'Entry' if parts[0] == 'entry' else 'Exit'
-                indicator_name = parts[2] if len(parts) > 2 else 'indicator'
-                display_name = f"{condition_type} {indicator_name} period"
-                
             param_comparison.append({
-                'parameter': display_name,
+                'parameter': _param_display_name(param_name),
                 'original_value': original_value,
                 'optimized_value': optimized_value
             })
@@ -572,9 +700,7 @@ def save_optimized_strategy():
             "parameter_comparison": param_comparison
         })
     except Exception as e:
-        logger.error(f"Error saving optimized strategy: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error saving optimized strategy: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/export-optimization-csv/<optimization_id>', methods=['GET'])
@@ -588,6 +714,13 @@ def export_optimization_csv(optimization_id):
             logger.error(f"Optimization with ID {optimization_id} not found")
             return jsonify({"success": False, "error": f"Optimization with ID {optimization_id} not found"}), 404
         
+        # Completed optimizations never change, so a report built once is served again as-is
+        cached_report = _csv_report_cache.get(optimization_id)
+        if cached_report is not None:
+            response = Response(cached_report, mimetype='text/csv')
+            response.headers['Content-Disposition'] = f'attachment; filename=optimization_report_{optimization_id}.csv'
+            return response
+        
         # Get optimization status
         status = optimizer.get_optimization_status(optimization_id)
         
@@ -596,21 +729,24 @@ def export_optimization_csv(optimization_id):
             logger.error(f"Optimization {optimization_id} is not completed yet")
             return jsonify({"success": False, "error": "Optimization not completed yet"}), 400
         
-        # Create CSV in memory
+        # Build the fixed sections up front so formatting errors still reach the 500 handler below;
+        # only the iteration rows, which grow with the number of calls, are streamed
         csv_buffer = io.StringIO()
         csv_writer = csv.writer(csv_buffer)
+        sections = []
         
         # Write header
-        csv_writer.writerow(['Trading Strategy Hyper-Tuner - Optimization Report'])
+        sections.append(_CSV_REPORT_TITLE)
         csv_writer.writerow(['Generated on:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
         csv_writer.writerow(['Optimization ID:', optimization_id])
         csv_writer.writerow([])
+        sections.append(_drain(csv_buffer))
         
         # Write performance comparison
-        csv_writer.writerow(['PERFORMANCE COMPARISON'])
+        sections.append(_CSV_COMPARISON_TITLE)
         if 'comparison' in status and status['comparison']:
             comparison = status['comparison']
-            csv_writer.writerow(['Metric', 'Original', 'Optimized', 'Improvement', 'Improvement (%)'])
+            sections.append(_CSV_COMPARISON_COLUMNS)
             
             # Helper function to calculate improvement
             def calc_improvement(original, optimized):
@@ -658,119 +794,141 @@ def export_optimization_csv(optimization_id):
                 csv_writer.writerow(['Trade Count', f"{orig_tc}", f"{opt_tc}", f"{imp}", imp_pct])
         
         csv_writer.writerow([])
+        sections.append(_drain(csv_buffer))
         
         # Write optimized parameters
         if 'best_params' in status and status['best_params']:
-            csv_writer.writerow(['OPTIMIZED PARAMETERS'])
-            csv_writer.writerow(['Parameter', 'Value'])
+            sections.append(_CSV_PARAMETERS_HEADER)
             
             for param_name, param_value in status['best_params'].items():
                 if isinstance(param_value, (int, float)):
                     csv_writer.writerow([param_name, f"{param_value:.4f}" if isinstance(param_value, float) else str(param_value)])
                 else:
                     csv_writer.writerow([param_name, str(param_value)])
-        
-        csv_writer.writerow([])
+            sections.append(_drain(csv_buffer))
         
         # Write optimization details
-        csv_writer.writerow(['OPTIMIZATION DETAILS'])
+        sections.append(_CSV_DETAILS_TITLE)
         csv_writer.writerow(['Status:', status.get('status', 'Unknown')])
         csv_writer.writerow(['Progress:', f"{status.get('progress', 0)}%"])
         csv_writer.writerow(['Best Result:', f"{status.get('best_result', 0):.4f}"])
+        sections.append(_drain(csv_buffer))
         
-        # Write iteration results if available
-        if 'iteration_results' in status and status['iteration_results']:
-            csv_writer.writerow([])
-            csv_writer.writerow(['ITERATION RESULTS'])
-            csv_writer.writerow(['Iteration', 'Objective Value', 'Best So Far'])
+        report_head = b''.join(sections)
+        iteration_results = status.get('iteration_results')
+        
+        def generate():
+            yield report_head
             
-            for result in status['iteration_results']:
-                iteration = result.get('iteration', 0)
-                obj_value = result.get('objective_value', 0)
-                best_so_far = result.get('best_so_far', 0)
-                
-                csv_writer.writerow([iteration, f"{obj_value:.4f}", f"{best_so_far:.4f}"])
+            # Write iteration results if available
+            if iteration_results:
+                yield _CSV_ITERATIONS_HEADER
+                rows = iter(iteration_results)
+                while True:
+                    batch = list(islice(rows, 1000))
+                    if not batch:
+                        break
+                    csv_writer.writerows(
+                        (result.get('iteration', 0), f"{result.get('objective_value', 0):.4f}", f"{result.get('best_so_far', 0):.4f}")
+                        for result in batch
+                    )
+                    yield _drain(csv_buffer)
+            
+            logger.info(f"Successfully generated CSV report for optimization: {optimization_id}")
         
-        # Get the CSV data
-        csv_data = csv_buffer.getvalue()
+        # Keep a copy of the streamed report once it has been sent in full. The 200 and headers are
+        # already sent by the time the rows are formatted, so a failure there can only be logged
+        def generate_and_cache():
+            chunks = []
+            try:
+                for chunk in generate():
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                logger.exception("CSV report for optimization %s was truncated: %s", optimization_id, e)
+                return
+            _csv_report_cache[optimization_id] = b''.join(chunks)
         
-        # Create a response with the CSV data
-        response = Response(csv_data, mimetype='text/csv')
+        # Create a streaming response with the CSV data
+        response = Response(stream_with_context(generate_and_cache()), mimetype='text/csv')
         response.headers['Content-Disposition'] = f'attachment; filename=optimization_report_{optimization_id}.csv'
-        
-        logger.info(f"Successfully generated CSV report for optimization: {optimization_id}")
         return response
     except Exception as e:
-        logger.error(f"Error generating CSV report: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error generating CSV report: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/debug/optimization-results/<optimization_id>', methods=['GET'])
 def debug_optimization_results(optimization_id):
     """Debug endpoint to check raw optimization results"""
     try:
-        logger.info(f"Debug request for raw optimization results: {optimization_id}")
-        
-        # Check if the optimization exists
-        if optimization_id not in optimizer.optimizations:
-            logger.error(f"Optimization with ID {optimization_id} not found")
-            return jsonify({"success": False, "error": f"Optimization with ID {optimization_id} not found"}), 404
+        logger.info("Debug request for raw optimization results: %s", optimization_id)
         
         # Get raw optimization data
-        raw_data = optimizer.optimizations.get(optimization_id, {})
+        raw_data = optimizer.optimizations.get(optimization_id)
+        if raw_data is None:
+            logger.error("Optimization with ID %s not found", optimization_id)
+            return jsonify({"success": False, "error": f"Optimization with ID {optimization_id} not found"}), 404
         
         # Log what we found
-        logger.info(f"Raw optimization data keys: {list(raw_data.keys())}")
+        logger.info("Raw optimization data keys: %s", list(raw_data.keys()))
+        
+        # Reuse the previous body while the record is unchanged
+        cache_key = (_status_cache_key(raw_data), len(raw_data))
+        etag = f"{_status_etag(cache_key[0])}-{cache_key[1]}"
+        if _if_none_match(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        cached = _debug_results_cache.get(optimization_id)
+        if cached is not None and cached[0] == cache_key:
+            response = app.response_class(cached[1], mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            return response
+        
+        # Read the fields used more than once a single time
+        best_params = raw_data.get('best_params')
+        comparison = raw_data.get('comparison')
+        comparison_is_dict = isinstance(comparison, dict)
+        best_result = raw_data.get('best_result')
+        
+        # Add some details about the optimization if they exist
+        best_params_sample = None
+        if best_params and isinstance(best_params, dict):
+            best_params_sample = dict(islice(zip(best_params, map(str, best_params.values())), 3))
+        
+        # Add iteration count if available
+        iteration_count = len(raw_data['iteration_results']) if 'iteration_results' in raw_data else None
         
-        # Create a simplified version that should be serializable
+        # Try to extract comparison data safely
+        original_summary = _summarize(comparison.get('original')) if comparison_is_dict else None
+        optimized_summary = _summarize(comparison.get('optimized')) if comparison_is_dict else None
+        
+        # Create a simplified version that should be serializable, in one literal; optional fields are left out when absent
         safe_data = {
             'status': raw_data.get('status', 'unknown'),
             'progress': raw_data.get('progress', 0),
             'has_best_params': 'best_params' in raw_data,
-            'best_result': float(raw_data.get('best_result', 0)) if raw_data.get('best_result') is not None else 0,
+            'best_result': best_result if type(best_result) is float else (float(best_result) if best_result is not None else 0),
             'has_comparison': 'comparison' in raw_data,
-            'comparison_keys': list(raw_data.get('comparison', {}).keys()) if isinstance(raw_data.get('comparison'), dict) else []
+            'comparison_keys': list(comparison.keys()) if comparison_is_dict else [],
+            **({'best_params_sample': best_params_sample} if best_params_sample is not None else {}),
+            **({'iteration_count': iteration_count} if iteration_count is not None else {}),
+            **({'original_summary': original_summary} if original_summary is not None else {}),
+            **({'optimized_summary': optimized_summary} if optimized_summary is not None else {})
         }
         
-        # Add some details about the optimization if they exist
-        if 'best_params' in raw_data and raw_data['best_params']:
-            try:
-                safe_data['best_params_sample'] = {
-                    k: str(v) for k, v in list(raw_data['best_params'].items())[:3]
-                }
-            except Exception as e:
-                logger.error(f"Error extracting best params sample: {str(e)}")
-                safe_data['best_params_error'] = str(e)
-        
-        # Add iteration count if available
-        if 'iteration_results' in raw_data:
-            safe_data['iteration_count'] = len(raw_data['iteration_results'])
-        
-        # Try to extract comparison data safely
-        if 'comparison' in raw_data and isinstance(raw_data['comparison'], dict):
-            if 'original' in raw_data['comparison']:
-                original = raw_data['comparison']['original']
-                if isinstance(original, dict):
-                    safe_data['original_summary'] = {
-                        k: str(v) for k, v in original.items()
-                    }
-            
-            if 'optimized' in raw_data['comparison']:
-                optimized = raw_data['comparison']['optimized']
-                if isinstance(optimized, dict):
-                    safe_data['optimized_summary'] = {
-                        k: str(v) for k, v in optimized.items()
-                    }
-        
-        return jsonify({"success": True, "data": safe_data})
+        payload = orjson.dumps({"success": True, "data": safe_data}, default=_orjson_default, option=ORJSON_OPTIONS)
+        _debug_results_cache[optimization_id] = (cache_key, payload)
+        response = app.response_class(payload, mimetype='application/json')
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
-        logger.error(f"Error in debug endpoint for raw optimization results: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error in debug endpoint for raw optimization results: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 if __name__ == '__main__':
     logger.info("Starting Flask server on port 3001")
-    app.run(debug=True, host='0.0.0.0', port=3001)
+    # Debugger and reloader are opt-in (FLASK_DEBUG=1); they add per-request overhead
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='0.0.0.0', port=3001, threaded=True)
@@ -3,50 +3,160 @@ import numpy as np
 import backtrader as bt
 import uuid
 import logging
+import math
+import operator
+import hashlib
+import json
 from datetime import datetime
-import tempfile
 import os
+import sys
+import tempfile
+from functools import lru_cache
 
 from indicators import Indicators
 
+# Comparison operators supported in strategy conditions; any other operator never matches
+_COMPARISONS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+# On-disk cache of historical data with indicators, next to this module (backend/cache is gitignored)
+_INDICATOR_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'indicators')
+# Least recently used files are evicted once the cache grows past this size
+_INDICATOR_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Bump to invalidate every cached frame, e.g. after changing how indicator columns are built
+_INDICATOR_CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _indicator_code_hash():
+    """Hash of the indicator implementation, so cached columns are dropped when that code changes"""
+    digest = hashlib.sha1()
+    module_dir = os.path.dirname(os.path.abspath(sys.modules[Indicators.__module__].__file__))
+    for filename in ('indicators.py', 'indicator_mappings.json'):
+        try:
+            with open(os.path.join(module_dir, filename), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(filename.encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _safe_line_name(name):
+    """Map a column or variable name to the identifier used for its data feed line"""
+    safe_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
+    if not safe_name[0].isalpha() and safe_name[0] != '_':
+        safe_name = 'ind_' + safe_name
+    return safe_name
+
+
 class BacktestEngine:
     """Class to handle backtesting of trading strategies"""
     
-    def __init__(self, data_provider):
+    def __init__(self, data_provider, cache_dir=_INDICATOR_CACHE_DIR):
         """Initialize the Backtest Engine"""
         self.logger = logging.getLogger(__name__)
         self.data_provider = data_provider
         self.indicators = Indicators()
+        # Historical data with indicators added, keyed by symbol/timeframe/range/indicators (None disables)
+        self.cache_dir = cache_dir
     
-    def _safe_to_list(self, value):
+    def _indicator_cache_path(self, symbol, timeframe, start_date, end_date, indicator_configs):
         """
-        Safely convert a value to a list, handling different types appropriately.
+        Get the cache file for historical data with indicators, if this backtest can use the cache
         
         Args:
-            value: The value to convert (numpy array, pandas Series, list, etc.)
+            symbol (str): Trading symbol
+            timeframe (str): Timeframe
+            start_date (str): Start date in format 'YYYY-MM-DD'
+            end_date (str): End date in format 'YYYY-MM-DD'
+            indicator_configs (list): Indicator conditions added to the data
             
         Returns:
-            list: The value converted to a list
+            str or None: Path of the cache file, or None if the data should not be cached
         """
-        if value is None:
-            return []
-            
-        # If it's already a list, return it directly
-        if isinstance(value, list):
-            return value
-            
-        # Check if it has a tolist method (numpy arrays, pandas Series)
-        if hasattr(value, 'tolist'):
-            return value.tolist()
-            
-        # Try to convert other iterables to a list
+        # Placeholder data and ranges that are still growing must always be fetched fresh
+        if not self.cache_dir or self.data_provider.is_using_placeholders():
+            return None
+        if end_date >= datetime.now().strftime('%Y-%m-%d'):
+            return None
+        
+        # Only the fields that shape the indicator columns; thresholds and comparisons do not
+        indicators = sorted(
+            json.dumps([config['indicator'], config.get('params', {}), config.get('variable')], sort_keys=True, default=str)
+            for config in indicator_configs
+        )
+        key = json.dumps([
+            _INDICATOR_CACHE_VERSION,
+            _indicator_code_hash(),
+            type(self.data_provider).__name__,
+            symbol,
+            timeframe,
+            start_date,
+            end_date,
+            indicators
+        ])
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(key.encode()).hexdigest()}.pkl")
+    
+    def _write_indicator_cache(self, cache_path, data_with_indicators):
+        """
+        Store historical data with indicators in the cache, then evict the least recently used files
+        
+        Args:
+            cache_path (str): Path from _indicator_cache_path
+            data_with_indicators (pandas.DataFrame): Data to cache
+        """
+        tmp_path = None
         try:
-            return list(value)
-        except:
-            # If all else fails, return an empty list
-            self.logger.warning(f"Could not convert {type(value)} to list, returning empty list")
-            return []
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a unique temp file, then rename, so no thread or process ever reads a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            data_with_indicators.to_pickle(tmp_path)
+            os.replace(tmp_path, cache_path)
+            tmp_path = None
+        except Exception as e:
+            self.logger.warning(f"Could not write indicator cache {cache_path}: {str(e)}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        
+        self._prune_indicator_cache()
+    
+    def _prune_indicator_cache(self):
+        """Evict the least recently used cache files until the cache fits in _INDICATOR_CACHE_MAX_BYTES"""
+        try:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.pkl'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            self.logger.warning(f"Could not scan indicator cache {self.cache_dir}: {str(e)}")
+            return
         
+        total = sum(size for _, size, _ in entries)
+        # Oldest first; hits touch their file, so mtime tracks last use
+        for _, size, path in sorted(entries):
+            if total <= _INDICATOR_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Already evicted by a concurrent backtest
+                pass
+            total -= size
+    
     def run_backtest(self, strategy, start_date, end_date, initial_capital=100000):
         """
         Run a backtest for a strategy
@@ -74,37 +184,53 @@ class BacktestEngine:
             stop_loss = strategy.get('stop_loss', 0)
             target_profit = strategy.get('target_profit', 0)
             
-            # Get historical data
-            self.logger.info(f"Getting historical data for {symbol} from {start_date} to {end_date} with timeframe {timeframe}")
-            data = self.data_provider.get_historical_data(symbol, timeframe, start_date, end_date)
-            
-            # Validate the data
-            if data.empty:
-                self.logger.error(f"No historical data found for {symbol} from {start_date} to {end_date}")
-                raise ValueError(f"No historical data found for {symbol} from {start_date} to {end_date}. Please check the symbol and date range.")
-                
-            # Check if close column exists and has valid data
-            if 'close' not in data.columns:
-                self.logger.error(f"No 'close' price data found for {symbol}")
-                raise ValueError(f"No 'close' price data found for {symbol}. This is required for backtesting.")
-                
-            if data['close'].isnull().all() or (data['close'] == 0).all():
-                self.logger.error(f"Invalid 'close' price data for {symbol} - all values are null or zero")
-                raise ValueError(f"Invalid 'close' price data for {symbol}. Please check the data source.")
-                
-            self.logger.info(f"Successfully retrieved data for {symbol} with {len(data)} data points")
-                
             # Add indicators to data
             indicator_configs = []
             for condition in entry_conditions + exit_conditions:
                 if 'indicator' in condition:
                     indicator_configs.append(condition)
             
-            # Validate data structure before adding indicators
-            self._validate_data_structure(data)
+            # Reuse historical data with the same indicators from an earlier backtest
+            data_with_indicators = None
+            cache_path = self._indicator_cache_path(symbol, timeframe, start_date, end_date, indicator_configs)
+            if cache_path and os.path.exists(cache_path):
+                try:
+                    # Mark as recently used for eviction
+                    os.utime(cache_path)
+                    data_with_indicators = pd.read_pickle(cache_path)
+                    self.logger.info(f"Loaded cached data with indicators for {symbol} from {cache_path}")
+                except Exception as e:
+                    self.logger.warning(f"Could not read indicator cache {cache_path}: {str(e)}")
             
-            self.logger.info(f"Adding {len(indicator_configs)} indicators to data")
-            data_with_indicators = self.indicators.add_all_indicators(data, indicator_configs)
+            if data_with_indicators is None:
+                # Get historical data
+                self.logger.info(f"Getting historical data for {symbol} from {start_date} to {end_date} with timeframe {timeframe}")
+                data = self.data_provider.get_historical_data(symbol, timeframe, start_date, end_date)
+            
+                # Validate the data
+                if data.empty:
+                    self.logger.error(f"No historical data found for {symbol} from {start_date} to {end_date}")
+                    raise ValueError(f"No historical data found for {symbol} from {start_date} to {end_date}. Please check the symbol and date range.")
+                
+                # Check if close column exists and has valid data
+                if 'close' not in data.columns:
+                    self.logger.error(f"No 'close' price data found for {symbol}")
+                    raise ValueError(f"No 'close' price data found for {symbol}. This is required for backtesting.")
+                
+                if data['close'].isnull().all() or (data['close'] == 0).all():
+                    self.logger.error(f"Invalid 'close' price data for {symbol} - all values are null or zero")
+                    raise ValueError(f"Invalid 'close' price data for {symbol}. Please check the data source.")
+                
+                self.logger.info(f"Successfully retrieved data for {symbol} with {len(data)} data points")
+                
+                # Validate data structure before adding indicators
+                self._validate_data_structure(data)
+            
+                self.logger.info(f"Adding {len(indicator_configs)} indicators to data")
+                data_with_indicators = self.indicators.add_all_indicators(data, indicator_configs)
+                
+                if cache_path:
+                    self._write_indicator_cache(cache_path, data_with_indicators)
             
             # Validate that all required indicators were added
             entry_indicator_vars = []
@@ -120,37 +246,42 @@ class BacktestEngine:
                     
             # Combine all required indicator variables
             all_indicator_vars = entry_indicator_vars + exit_indicator_vars
+            safe_names = {var: _safe_line_name(var) for var in all_indicator_vars}
             
             # Check if any of the required indicators are missing
             missing_indicators = []
             for var in all_indicator_vars:
-                # Check direct match
-                if var not in data_with_indicators.columns:
-                    # Also check sanitized version
-                    safe_var_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in var)
-                    if not safe_var_name[0].isalpha() and safe_var_name[0] != '_':
-                        safe_var_name = 'ind_' + safe_var_name
-                        
-                    # Still missing after sanitization?
-                    if safe_var_name not in data_with_indicators.columns:
-                        missing_indicators.append(var)
+                # Check direct match, then the sanitized version
+                if var not in data_with_indicators.columns and safe_names[var] not in data_with_indicators.columns:
+                    missing_indicators.append(var)
             
             if missing_indicators:
                 self.logger.error(f"Missing required indicators in data: {missing_indicators}")
                 self.logger.error(f"Available columns: {list(data_with_indicators.columns)}")
                 raise ValueError(f"Failed to calculate required indicators: {', '.join(missing_indicators)}. Check your indicator parameters.")
                 
-            # Log all available indicators for debugging
-            self.logger.info(f"All columns available for backtesting: {list(data_with_indicators.columns)}")
-            self.logger.info(f"Required indicator variables: {all_indicator_vars}")
+            # Log all available indicators for debugging; skip building the column list when INFO is off
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("All columns available for backtesting: %s", list(data_with_indicators.columns))
+                self.logger.info("Required indicator variables: %s", all_indicator_vars)
             self.logger.info(f"All validations passed, proceeding with creating strategy")
                 
                 
             self.logger.info(f"Successfully added indicators to data. Shape: {data_with_indicators.shape}")
             
-            # Drop rows with NaN values that might have been introduced by indicators
+            # Drop rows with NaN values that might have been introduced by indicators.
+            # Those sit in the indicator warmup at the top of the frame, whose length is bounded by
+            # the configured periods, so only that head is checked for the first complete row.
             orig_len = len(data_with_indicators)
-            data_with_indicators = data_with_indicators.dropna()
+            warmup_bound = self._indicator_warmup_bound(indicator_configs)
+            complete = None
+            if warmup_bound is not None:
+                complete = data_with_indicators.iloc[:warmup_bound + 1].notna().all(axis=1).to_numpy()
+            if complete is not None and complete.any():
+                data_with_indicators = data_with_indicators.iloc[int(complete.argmax()):]
+            else:
+                # Periods not configured (TA-Lib defaults apply) or the bound was too short
+                data_with_indicators = data_with_indicators.dropna()
             if len(data_with_indicators) < orig_len:
                 self.logger.warning(f"Dropped {orig_len - len(data_with_indicators)} rows with NaN values")
                 
@@ -166,7 +297,8 @@ class BacktestEngine:
                     entry_conditions, 
                     exit_conditions, 
                     stop_loss, 
-                    target_profit
+                    target_profit,
+                    safe_names
                 )
             except Exception as e:
                 self.logger.error(f"Failed to create Backtrader strategy class: {str(e)}")
@@ -201,53 +333,19 @@ class BacktestEngine:
             portfolio_value = cerebro.broker.getvalue()
             returns = (portfolio_value - initial_capital) / initial_capital * 100
             
-            # Get all trades
-            trades = []
+            # Get all trades; notify_order already records them as complete dicts,
+            # so only the entry/exit datetimes need converting to strings
+            trades = strat.trades
             try:
-                self.logger.info(f"Processing {len(strat.trades)} trade records")
-                
-                for i, trade in enumerate(strat.trades):
-                    try:
-                        # Handle trade data whether it's a dictionary or an object
-                        if isinstance(trade, dict):
-                            # For dictionary trades
-                            self.logger.debug(f"Processing dictionary trade {i+1}: {trade}")
-                            trade_data = {
-                                'entry_date': self._format_datetime(trade.get('entry_date')),
-                                'entry_price': trade.get('entry_price'),
-                                'exit_date': self._format_datetime(trade.get('exit_date')),
-                                'exit_price': trade.get('exit_price'),
-                                'profit_points': trade.get('profit_points', 0),
-                                'profit_pct': trade.get('profit_pct', 0),
-                                'size': trade.get('size', 1)
-                            }
-                        else:
-                            # For object trades (in case we change implementation later)
-                            self.logger.debug(f"Processing object trade {i+1}: {type(trade)}")
-                            trade_data = {
-                                'entry_date': self._format_datetime(getattr(trade, 'entry_date', None)),
-                                'entry_price': getattr(trade, 'entry_price', 0),
-                                'exit_date': self._format_datetime(getattr(trade, 'exit_date', None)),
-                                'exit_price': getattr(trade, 'exit_price', 0),
-                                'profit_points': getattr(trade, 'profit_points', 0),
-                                'profit_pct': getattr(trade, 'profit_pct', 0),
-                                'size': getattr(trade, 'size', 1)
-                            }
-                            
-                        trades.append(trade_data)
-                        self.logger.debug(f"Successfully processed trade {i+1}")
-                    except Exception as e:
-                        self.logger.warning(f"Error processing trade {i+1}: {str(e)}")
-                        # Create a minimal valid trade record to avoid breaking analysis
-                        trades.append({
-                            'entry_date': 'Unknown',
-                            'entry_price': 0,
-                            'exit_date': 'Unknown',
-                            'exit_price': 0,
-                            'profit_points': 0,
-                            'profit_pct': 0,
-                            'size': 1
-                        })
+                self.logger.info(f"Processing {len(trades)} trade records")
+                
+                if trades:
+                    # Format all entry and exit datetimes in two vectorized calls
+                    entry_dates = pd.DatetimeIndex([trade['entry_date'] for trade in trades]).strftime('%Y-%m-%d %H:%M:%S')
+                    exit_dates = pd.DatetimeIndex([trade['exit_date'] for trade in trades]).strftime('%Y-%m-%d %H:%M:%S')
+                    for trade, entry_date, exit_date in zip(trades, entry_dates, exit_dates):
+                        trade['entry_date'] = entry_date
+                        trade['exit_date'] = exit_date
             except Exception as e:
                 self.logger.error(f"Error processing trades list: {str(e)}")
                 # Create a minimal set of trades for results
@@ -255,9 +353,10 @@ class BacktestEngine:
             
             # Calculate additional metrics and prepare results
             try:
-                winning_trades = [t for t in trades if t['profit_pct'] > 0]
-                losing_trades = [t for t in trades if t['profit_pct'] <= 0]
-                win_rate = len(winning_trades) / len(trades) if trades else 0
+                profit_pct = np.fromiter((t['profit_pct'] for t in trades), dtype=np.float64, count=len(trades))
+                winning_trades = int((profit_pct > 0).sum())
+                losing_trades = len(trades) - winning_trades
+                win_rate = winning_trades / len(trades) if trades else 0
                 
                 # Get metrics from strategy instance
                 equity_curve = getattr(strat, 'equity_curve', [])
@@ -278,11 +377,12 @@ class BacktestEngine:
                 'max_drawdown': max_drawdown,
                 'sharpe_ratio': sharpe_ratio,
                 'trade_count': len(trades),
-                'winning_trades': len(winning_trades),
-                'losing_trades': len(losing_trades),
+                'winning_trades': winning_trades,
+                'losing_trades': losing_trades,
                 'trades': trades,
-                'equity_curve': self._safe_to_list(equity_curve),
-                'returns_series': self._safe_to_list(returns_series),
+                # float64 arrays; orjson serializes them directly at the API and storage boundary
+                'equity_curve': equity_curve,
+                'returns_series': returns_series,
                 'summary': {
                     'returns': returns,
                     'win_rate': win_rate,
@@ -328,35 +428,7 @@ class BacktestEngine:
             self.logger.error(f"Error running backtest: {str(e)}")
             raise
     
-    def _format_datetime(self, dt_value):
-        """
-        Format a datetime value to string, handling various input types
-        
-        Args:
-            dt_value: Can be datetime object, string, or None
-            
-        Returns:
-            str or None: Formatted datetime string or None
-        """
-        if dt_value is None:
-            return None
-            
-        try:
-            # If it's already a string, return as is
-            if isinstance(dt_value, str):
-                return dt_value
-                
-            # If it's a datetime object, format it
-            if isinstance(dt_value, datetime):
-                return dt_value.strftime('%Y-%m-%d %H:%M:%S')
-                
-            # Try to convert other types to string
-            return str(dt_value)
-        except Exception as e:
-            self.logger.warning(f"Error formatting datetime: {str(e)}")
-            return str(dt_value) if dt_value is not None else None
-    
-    def _create_bt_strategy_class(self, strategy_type, entry_conditions, exit_conditions, stop_loss=0, target_profit=0):
+    def _create_bt_strategy_class(self, strategy_type, entry_conditions, exit_conditions, stop_loss=0, target_profit=0, safe_names=None):
         """
         Create a Backtrader strategy class dynamically
         
@@ -364,22 +436,54 @@ class BacktestEngine:
             strategy_type (str): Strategy type (buy or sell)
             entry_conditions (list): List of entry conditions
             exit_conditions (list): List of exit conditions
+            safe_names (dict): Precomputed condition variable -> data feed line name mapping
             
         Returns:
             backtrader.Strategy: Backtrader strategy class
         """
         # Define a custom strategy class
+        logger = self.logger
+        
+        if safe_names is None:
+            safe_names = {
+                condition['variable']: _safe_line_name(condition['variable'])
+                for condition in entry_conditions + exit_conditions
+                if 'variable' in condition
+            }
+        
         class CustomStrategy(bt.Strategy):
+            _safe_names = safe_names
+            # Resolved once per class so log() and the debug-only blocks cost nothing otherwise
+            _debug = logger.isEnabledFor(logging.DEBUG)
+            
             def __init__(self):
                 self.order = None
                 self.buyprice = None
                 self.buycomm = None
                 self.trades = []
-                self.equity_curve = []
-                self.returns = []
+                # Preallocated per-bar series (data is preloaded, so buflen() is the bar count); trimmed in stop()
+                n_bars = self.datas[0].buflen()
+                self.equity_curve = np.empty(n_bars, dtype=np.float64)
+                self.returns = np.empty(n_bars, dtype=np.float64)
                 self.max_drawdown = 0
                 self.sharpe_ratio = 0
                 
+                # Running mean and sum of squared deviations of the returns (Welford),
+                # so the Sharpe ratio is computed once in stop()
+                self._ret_mean = 0.0
+                self._ret_m2 = 0.0
+                self._ret_n = 0
+                
+                # Highest and previous portfolio values, for the drawdown and returns
+                self._peak = float('-inf')
+                self._prev_value = None
+                
+                # Bound references to the data feed and broker used on every bar
+                self._data = self.datas[0]
+                self._close = self._data.close
+                self._bar_datetime = self._data.datetime.datetime
+                self._portfolio_value = self.broker.getvalue
+                
                 # Add position tracking to fix the 'barlen' issue
                 self.position_entry_bar = None  # Store the bar when a position is entered
                 
@@ -393,13 +497,16 @@ class BacktestEngine:
                 self.stop_loss = stop_loss
                 self.target_profit = target_profit
                 
-                # Log available data feed lines for debugging
-                self.log("Available data feed lines:")
-                for i, data in enumerate(self.datas):
-                    self.log(f"Data feed {i} lines: {', '.join([l for l in dir(data.lines) if not l.startswith('_')])}")
+                # Absolute target/stop price levels, set when an entry price is known (None when disabled)
+                self._take_price = None
+                self._stop_price = None
                 
-                # Log strategy conditions for debugging
-                self.log(f"Entry conditions: {self.entry_conditions}")
+                # Log available data feed lines and strategy conditions for debugging
+                if self._debug:
+                    self.log("Available data feed lines:")
+                    for i, data in enumerate(self.datas):
+                        self.log(f"Data feed {i} lines: {', '.join([l for l in dir(data.lines) if not l.startswith('_')])}")
+                    self.log(f"Entry conditions: {self.entry_conditions}")
                 
                 # Initialize variables
                 for condition in self.entry_conditions + self.exit_conditions:
@@ -415,51 +522,114 @@ class BacktestEngine:
                         except Exception as e:
                             self.log(f"Error setting attribute for variable '{var_name}': {str(e)}")
                             
-                # Check for each variable if it exists as a line in the data feed
-                for condition in self.entry_conditions + self.exit_conditions:
-                    if 'variable' in condition:
-                        var_name = condition['variable']
-                        # Also check the sanitized name
-                        safe_var_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in var_name)
-                        if not safe_var_name[0].isalpha() and safe_var_name[0] != '_':
-                            safe_var_name = 'ind_' + safe_var_name
-                            
-                        has_line = hasattr(self.datas[0].lines, var_name)
-                        has_safe_line = hasattr(self.datas[0].lines, safe_var_name)
-                        
-                        self.log(f"Variable {var_name} as line: {has_line}, as safe line {safe_var_name}: {has_safe_line}")
-                        
-                        if not has_line and not has_safe_line:
-                            self.log(f"WARNING: Variable {var_name} is not available as a line in the data feed")
-                            self.log(f"This may cause the strategy to fail when evaluating conditions")
-                            self.log(f"Please check indicator configuration and variable naming")
+                # Resolve each variable to its line in the data feed once: exact name first, then sanitized name
+                lines = self._data.lines
+                self._line_names = {}
+                for var_name, safe_var_name in self._safe_names.items():
+                    if hasattr(lines, var_name):
+                        line_name = var_name
+                    elif hasattr(lines, safe_var_name):
+                        line_name = safe_var_name
+                    else:
+                        line_name = None
+                        logger.warning("Variable %s is not available as a line in the data feed; "
+                                       "check indicator configuration and variable naming", var_name)
+                    self._line_names[var_name] = line_name
+                    
+                    if self._debug:
+                        self.log(f"Variable {var_name} resolved to line: {line_name}")
                             
+                # Resolve the comparison conditions once instead of on every bar
+                self._entry_rules = self._compile_rules(self.entry_conditions)
+                self._exit_rules = self._compile_rules(self.exit_conditions)
+                
+                # Evaluate them for every bar up front; next() then only indexes the masks
+                self._entry_signal = self._signal_mask(self._entry_rules, n_bars)
+                self._exit_signal = self._signal_mask(self._exit_rules, n_bars)
+                
                 # Log completed initialization
                 self.log("Strategy initialization complete")
                 
                 # Additional setup for debug purposes
                 # Store the starting time of the strategy
                 self.start_date = self.datas[0].datetime.datetime(0)
-                self.log(f"Starting strategy at: {self.start_date}")
                 
                 # Debug: check if first few bars have indicator values
-                for i in range(min(3, len(self.datas[0]))):
-                    self.log(f"Bar {i} values:")
-                    for line_name in [l for l in dir(self.datas[0].lines) if not l.startswith('_')]:
-                        line = getattr(self.datas[0].lines, line_name)
-                        try:
-                            self.log(f"  {line_name}: {line[i]}")
-                        except:
-                            self.log(f"  {line_name}: Error accessing value")
-                    self.log("---")
+                if self._debug:
+                    self.log(f"Starting strategy at: {self.start_date}")
+                    for i in range(min(3, len(self.datas[0]))):
+                        self.log(f"Bar {i} values:")
+                        for line_name in [l for l in dir(self.datas[0].lines) if not l.startswith('_')]:
+                            line = getattr(self.datas[0].lines, line_name)
+                            try:
+                                self.log(f"  {line_name}: {line[i]}")
+                            except:
+                                self.log(f"  {line_name}: Error accessing value")
+                        self.log("---")
                     
                 self.log("Strategy ready")
                 
             
+            def _compile_rules(self, conditions):
+                """
+                Resolve comparison conditions against the data feed
+                
+                Args:
+                    conditions (list): Entry or exit conditions
+                    
+                Returns:
+                    list: (line, compare, threshold, line_name, comparison) tuples for the conditions
+                          that can be evaluated; indicator definitions, missing lines and
+                          unknown operators are left out since they can never match
+                """
+                lines = self._data.lines
+                rules = []
+                for condition in conditions:
+                    if 'comparison' not in condition or 'variable' not in condition:
+                        continue
+                    
+                    line_name = self._line_names[condition['variable']]
+                    if line_name is None:
+                        continue
+                    
+                    comparison = condition.get('comparison', '>')
+                    compare = _COMPARISONS.get(comparison)
+                    if compare is None:
+                        continue
+                    
+                    rules.append((getattr(lines, line_name), compare, condition.get('threshold', 0), line_name, comparison))
+                return rules
+            
+            def _signal_mask(self, rules, n_bars):
+                """
+                Evaluate compiled rules over the whole preloaded data feed
+                
+                Args:
+                    rules (list): Rules from _compile_rules
+                    n_bars (int): Number of bars in the data feed
+                    
+                Returns:
+                    numpy.ndarray or None: Boolean mask per bar that is True where any rule matches,
+                                           or None if there are no rules or the feed is not preloaded
+                                           (the evaluators then fall back to the per-bar rule loop)
+                """
+                # Without preloading the line buffers fill bar by bar and buflen() is 0 in __init__
+                if not rules or not self.env.p.preload or n_bars == 0:
+                    return None
+                
+                mask = np.zeros(n_bars, dtype=bool)
+                for line, compare, threshold, line_name, comparison in rules:
+                    if len(line.array) != n_bars:
+                        return None
+                    mask |= compare(np.frombuffer(line.array, dtype=np.float64), threshold)
+                return mask
+            
             def log(self, txt, dt=None):
                 """Logging function"""
+                if not self._debug:
+                    return
                 dt = dt or self.datas[0].datetime.date(0)
-                print(f"{dt.isoformat()}: {txt}")
+                logger.debug("%s: %s", dt.isoformat(), txt)
             
             def notify_order(self, order):
                 """Handle order notifications"""
@@ -470,13 +640,22 @@ class BacktestEngine:
                 # Check if an order has been completed
                 if order.status in [order.Completed]:
                     if order.isbuy():
-                        self.log(f"BUY EXECUTED, Price: {order.executed.price:.2f}, Cost: {order.executed.value:.2f}, Comm: {order.executed.comm:.2f}")
+                        if self._debug:
+                            self.log(f"BUY EXECUTED, Price: {order.executed.price:.2f}, Cost: {order.executed.value:.2f}, Comm: {order.executed.comm:.2f}")
                         self.buyprice = order.executed.price
                         self.buycomm = order.executed.comm
                         
+                        # Convert the target profit and stop loss percentages to price levels once
+                        if strategy_type == 'buy':
+                            take_factor, stop_factor = 1 + self.target_profit / 100, 1 - self.stop_loss / 100
+                        else:
+                            take_factor, stop_factor = 1 - self.target_profit / 100, 1 + self.stop_loss / 100
+                        self._take_price = self.buyprice * take_factor if self.target_profit > 0 else None
+                        self._stop_price = self.buyprice * stop_factor if self.stop_loss > 0 else None
+                        
                         # Create a new trade record
                         self.current_trade = {
-                            'entry_date': self.datas[0].datetime.datetime(0),
+                            'entry_date': self._bar_datetime(0),
                             'entry_price': order.executed.price,
                             'exit_date': None,
                             'exit_price': None,
@@ -486,13 +665,14 @@ class BacktestEngine:
                         }
                         
                         # Store the current bar index for position tracking
-                        self.position_entry_bar = len(self.datas[0])
+                        self.position_entry_bar = len(self._data)
                     
                     elif order.issell():
-                        self.log(f"SELL EXECUTED, Price: {order.executed.price:.2f}, Cost: {order.executed.value:.2f}, Comm: {order.executed.comm:.2f}")
+                        if self._debug:
+                            self.log(f"SELL EXECUTED, Price: {order.executed.price:.2f}, Cost: {order.executed.value:.2f}, Comm: {order.executed.comm:.2f}")
                         
                         # Update the current trade record
-                        self.current_trade['exit_date'] = self.datas[0].datetime.datetime(0)
+                        self.current_trade['exit_date'] = self._bar_datetime(0)
                         self.current_trade['exit_price'] = order.executed.price
                         
                         # Calculate profit in points and percent
@@ -521,7 +701,8 @@ class BacktestEngine:
                 if not trade.isclosed:
                     return
                 
-                self.log(f"OPERATION PROFIT, GROSS: {trade.pnl:.2f}, NET: {trade.pnlcomm:.2f}")
+                if self._debug:
+                    self.log(f"OPERATION PROFIT, GROSS: {trade.pnl:.2f}, NET: {trade.pnlcomm:.2f}")
             
             def next(self):
                 """Define what to do for each bar"""
@@ -529,37 +710,35 @@ class BacktestEngine:
                 if self.order:
                     return
                 
-                # Update equity curve
-                self.equity_curve.append(self.broker.getvalue())
+                # Update equity curve and the running peak
+                i = self._ret_n
+                if i == self.equity_curve.size:
+                    # Only reachable if the feed was not preloaded; grow like a list would
+                    self.equity_curve = np.resize(self.equity_curve, 2 * i + 1)
+                    self.returns = np.resize(self.returns, 2 * i + 1)
+                value = self._portfolio_value()
+                self.equity_curve[i] = value
+                if value > self._peak:
+                    self._peak = value
                 
                 # Calculate returns
-                if len(self.equity_curve) > 1:
-                    daily_return = (self.equity_curve[-1] / self.equity_curve[-2]) - 1
-                    self.returns.append(daily_return)
+                if i > 0:
+                    daily_return = (value / self._prev_value) - 1
                 else:
-                    self.returns.append(0)
+                    daily_return = 0
+                self._prev_value = value
+                self.returns[i] = daily_return
+                self._ret_n = i + 1
+                delta = daily_return - self._ret_mean
+                self._ret_mean += delta / self._ret_n
+                self._ret_m2 += delta * (daily_return - self._ret_mean)
                 
                 # Update max drawdown
-                if len(self.equity_curve) > 1:
-                    # Calculate drawdown
-                    peak = max(self.equity_curve)
-                    drawdown = (peak - self.equity_curve[-1]) / peak * 100
-                    self.max_drawdown = max(self.max_drawdown, drawdown)
-                
-                # Calculate Sharpe ratio
-                if len(self.returns) > 1:
-                    try:
-                        returns_array = np.array(self.returns)
-                        # Avoid division by zero or NaN values
-                        std_dev = np.std(returns_array)
-                        if std_dev > 0 and not np.isnan(std_dev):
-                            self.sharpe_ratio = np.mean(returns_array) / std_dev * np.sqrt(252)
-                        else:
-                            self.sharpe_ratio = 0
-                            print(f"{self.datas[0].datetime.date(0).isoformat()}: Warning: Standard deviation of returns is zero or NaN, setting Sharpe ratio to 0")
-                    except Exception as e:
-                        self.sharpe_ratio = 0
-                        print(f"{self.datas[0].datetime.date(0).isoformat()}: Error calculating Sharpe ratio: {str(e)}. Setting to 0.")
+                if i > 0:
+                    # Calculate drawdown against the highest value seen so far
+                    drawdown = (self._peak - value) / self._peak * 100
+                    if drawdown > self.max_drawdown:
+                        self.max_drawdown = drawdown
                 
                 # Check entry conditions if not in position
                 if not self.position:
@@ -572,10 +751,12 @@ class BacktestEngine:
                         
                         # Enter position
                         if strategy_type == 'buy':
-                            self.log(f"BUY CREATE, {size} @ {self.datas[0].close[0]:.2f}")
+                            if self._debug:
+                                self.log(f"BUY CREATE, {size} @ {self._close[0]:.2f}")
                             self.order = self.buy(size=size)
                         else:  # sell strategy
-                            self.log(f"SELL CREATE, {size} @ {self.datas[0].close[0]:.2f}")
+                            if self._debug:
+                                self.log(f"SELL CREATE, {size} @ {self._close[0]:.2f}")
                             self.order = self.sell(size=size)
                             
                         # Note: position_entry_bar will be set in notify_order when the order is executed
@@ -583,27 +764,31 @@ class BacktestEngine:
                 # Check exit conditions if in position
                 else:
                     # Check stop loss and target profit first
-                    price = self.datas[0].close[0]
+                    price = self._close[0]
                     entry_price = self.buyprice
                     
                     if entry_price is not None:
+                        take_price = self._take_price
+                        stop_price = self._stop_price
                         if strategy_type == 'buy':
                             # For buy strategy
-                            profit_pct = (price / entry_price - 1) * 100
-                            loss_pct = (1 - price / entry_price) * 100
+                            hit_target = take_price is not None and price >= take_price
+                            hit_stop = stop_price is not None and price <= stop_price
                         else:
                             # For sell strategy
-                            profit_pct = (1 - price / entry_price) * 100
-                            loss_pct = (price / entry_price - 1) * 100
+                            hit_target = take_price is not None and price <= take_price
+                            hit_stop = stop_price is not None and price >= stop_price
                         
                         # Check if we hit target profit
-                        if self.target_profit > 0 and profit_pct >= self.target_profit:
-                            self.log(f"TARGET PROFIT REACHED: {profit_pct:.2f}%")
+                        if hit_target:
+                            if self._debug:
+                                self.log(f"TARGET PROFIT REACHED: {abs(price / entry_price - 1) * 100:.2f}%")
                             exit_trade = True
                         
                         # Check if we hit stop loss
-                        elif self.stop_loss > 0 and loss_pct >= self.stop_loss:
-                            self.log(f"STOP LOSS TRIGGERED: {loss_pct:.2f}%")
+                        elif hit_stop:
+                            if self._debug:
+                                self.log(f"STOP LOSS TRIGGERED: {abs(price / entry_price - 1) * 100:.2f}%")
                             exit_trade = True
                         
                         # Otherwise, evaluate other exit conditions
@@ -616,89 +801,48 @@ class BacktestEngine:
                     if exit_trade:
                         # Exit position
                         if strategy_type == 'buy':
-                            self.log(f"SELL CREATE, {self.position.size} @ {self.datas[0].close[0]:.2f}")
+                            if self._debug:
+                                self.log(f"SELL CREATE, {self.position.size} @ {self._close[0]:.2f}")
                             self.order = self.sell(size=self.position.size)
                         else:  # sell strategy
-                            self.log(f"BUY CREATE, {abs(self.position.size)} @ {self.datas[0].close[0]:.2f}")
+                            if self._debug:
+                                self.log(f"BUY CREATE, {abs(self.position.size)} @ {self._close[0]:.2f}")
                             self.order = self.buy(size=abs(self.position.size))
             
+            def stop(self):
+                """Trim the per-bar series and compute the Sharpe ratio from the running return statistics"""
+                n = self._ret_n
+                self.equity_curve = self.equity_curve[:n]
+                self.returns = self.returns[:n]
+                if n > 1:
+                    # Population standard deviation, matching np.std
+                    std_dev = math.sqrt(self._ret_m2 / n)
+                    # Avoid division by zero or NaN values
+                    if std_dev > 0:
+                        self.sharpe_ratio = self._ret_mean / std_dev * math.sqrt(252)
+                    else:
+                        self.sharpe_ratio = 0
+                        self.log("Warning: Standard deviation of returns is zero or NaN, setting Sharpe ratio to 0")
+            
             def _evaluate_entry_conditions(self):
                 """Evaluate entry conditions"""
                 # Get the current bar
-                current_bar = len(self.datas[0])
+                current_bar = len(self._data)
                 
                 # Need a minimum number of bars for indicators to work
                 if current_bar < 30:  # Arbitrary threshold to ensure indicators have enough data
                     return False
                 
-                # Parse and evaluate conditions
-                for condition in self.entry_conditions:
-                    # Skip indicator definitions (these are just for adding indicators)
-                    if 'indicator' in condition and 'comparison' not in condition:
-                        continue
-                        
-                    # If it's a comparison condition
-                    if 'comparison' in condition:
-                        # Get the variable to compare
-                        if 'variable' in condition:
-                            var_name = condition['variable']
-                            
-                            # Sanitize variable name to match line name formatting in data feed
-                            safe_var_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in var_name)
-                            if not safe_var_name[0].isalpha() and safe_var_name[0] != '_':
-                                safe_var_name = 'ind_' + safe_var_name
-                            
-                            # Check if the variable is defined as a line in the data feed
-                            # First try exact name, then sanitized name
-                            line_exists = False
-                            if hasattr(self.datas[0].lines, var_name):
-                                line_exists = True
-                                line_name = var_name
-                            elif hasattr(self.datas[0].lines, safe_var_name):
-                                line_exists = True
-                                line_name = safe_var_name
-                                
-                            if line_exists:
-                                # Log that we found the indicator line
-                                self.log(f"Found indicator line for {var_name} as {line_name}")
-                                
-                                # Get the current value of the variable
-                                var_value = getattr(self.datas[0].lines, line_name)[0]
-                                
-                                # Get the threshold to compare against
-                                threshold = condition.get('threshold', 0)
-                                
-                                # Get the comparison operator
-                                comparison = condition.get('comparison', '>')
-                                
-                                # Log the comparison we're about to make
-                                self.log(f"Evaluating condition: {line_name} {comparison} {threshold} (current value: {var_value})")
-                                
-                                # Evaluate the condition
-                                if comparison == '>':
-                                    if var_value > threshold:
-                                        return True
-                                elif comparison == '>=':
-                                    if var_value >= threshold:
-                                        return True
-                                elif comparison == '<':
-                                    if var_value < threshold:
-                                        return True
-                                elif comparison == '<=':
-                                    if var_value <= threshold:
-                                        return True
-                                elif comparison == '==':
-                                    if var_value == threshold:
-                                        return True
-                                elif comparison == '!=':
-                                    if var_value != threshold:
-                                        return True
-                            else:
-                                # Log that we couldn't find the indicator line
-                                self.log(f"Warning: Indicator line '{var_name}' not found in data feed")
-                                # List available lines for debugging
-                                available_lines = dir(self.datas[0].lines)
-                                self.log(f"Available lines: {', '.join([l for l in available_lines if not l.startswith('_')])}")
+                # Any matching condition triggers entry
+                if self._entry_signal is not None and not self._debug:
+                    return bool(self._entry_signal[current_bar - 1])
+                
+                for line, compare, threshold, line_name, comparison in self._entry_rules:
+                    var_value = line[0]
+                    if self._debug:
+                        self.log(f"Evaluating condition: {line_name} {comparison} {threshold} (current value: {var_value})")
+                    if compare(var_value, threshold):
+                        return True
                 
                 # If no conditions triggered, return False
                 return False
@@ -707,93 +851,61 @@ class BacktestEngine:
                 """Evaluate exit conditions"""
                 # Check how long we've been in position
                 bars_in_position = 0
-                current_bar = len(self.datas[0])
+                current_bar = len(self._data)
                 
                 if self.position_entry_bar is not None:
                     bars_in_position = current_bar - self.position_entry_bar
-                    self.log(f"Position tracking: Current bar: {current_bar}, Entry bar: {self.position_entry_bar}, Bars in position: {bars_in_position}")
-                else:
-                    self.log(f"Position tracking: Entry bar not set, using default 0 bars in position")
+                    if self._debug:
+                        self.log(f"Position tracking: Current bar: {current_bar}, Entry bar: {self.position_entry_bar}, Bars in position: {bars_in_position}")
+                elif self._debug:
+                    self.log("Position tracking: Entry bar not set, using default 0 bars in position")
                 
-                # Parse and evaluate conditions
-                for condition in self.exit_conditions:
-                    # Skip indicator definitions (these are just for adding indicators)
-                    if 'indicator' in condition and 'comparison' not in condition:
-                        continue
-                        
-                    # If it's a comparison condition
-                    if 'comparison' in condition:
-                        # Get the variable to compare
-                        if 'variable' in condition:
-                            var_name = condition['variable']
-                            
-                            # Sanitize variable name to match line name formatting in data feed
-                            safe_var_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in var_name)
-                            if not safe_var_name[0].isalpha() and safe_var_name[0] != '_':
-                                safe_var_name = 'ind_' + safe_var_name
-                            
-                            # Check if the variable is defined as a line in the data feed
-                            # First try exact name, then sanitized name
-                            line_exists = False
-                            if hasattr(self.datas[0].lines, var_name):
-                                line_exists = True
-                                line_name = var_name
-                            elif hasattr(self.datas[0].lines, safe_var_name):
-                                line_exists = True
-                                line_name = safe_var_name
-                                
-                            if line_exists:
-                                # Log that we found the indicator line
-                                self.log(f"Found indicator line for {var_name} as {line_name}")
-                                
-                                # Get the current value of the variable
-                                var_value = getattr(self.datas[0].lines, line_name)[0]
-                                
-                                # Get the threshold to compare against
-                                threshold = condition.get('threshold', 0)
-                                
-                                # Get the comparison operator
-                                comparison = condition.get('comparison', '>')
-                                
-                                # Log the comparison we're about to make
-                                self.log(f"Evaluating exit condition: {line_name} {comparison} {threshold} (current value: {var_value})")
-                                
-                                # Evaluate the condition
-                                if comparison == '>':
-                                    if var_value > threshold:
-                                        return True
-                                elif comparison == '>=':
-                                    if var_value >= threshold:
-                                        return True
-                                elif comparison == '<':
-                                    if var_value < threshold:
-                                        return True
-                                elif comparison == '<=':
-                                    if var_value <= threshold:
-                                        return True
-                                elif comparison == '==':
-                                    if var_value == threshold:
-                                        return True
-                                elif comparison == '!=':
-                                    if var_value != threshold:
-                                        return True
-                            else:
-                                # Log that we couldn't find the indicator line
-                                self.log(f"Warning: Indicator line '{var_name}' not found in data feed")
-                                # List available lines for debugging
-                                available_lines = dir(self.datas[0].lines)
-                                self.log(f"Available lines: {', '.join([l for l in available_lines if not l.startswith('_')])}")
+                # Any matching condition triggers exit
+                if self._exit_signal is not None and not self._debug:
+                    if self._exit_signal[current_bar - 1]:
+                        return True
+                else:
+                    for line, compare, threshold, line_name, comparison in self._exit_rules:
+                        var_value = line[0]
+                        if self._debug:
+                            self.log(f"Evaluating exit condition: {line_name} {comparison} {threshold} (current value: {var_value})")
+                        if compare(var_value, threshold):
+                            return True
                 
                 # If no conditions triggered, check if we've been in position too long
                 # as a failsafe - exit after 20 days in position if no other exit triggered
                 if bars_in_position > 20:
-                    self.log(f"Exit triggered by position duration: {bars_in_position} bars exceeds 20 bar limit")
+                    if self._debug:
+                        self.log(f"Exit triggered by position duration: {bars_in_position} bars exceeds 20 bar limit")
                     return True
                     
                 return False
         
         return CustomStrategy
     
+    def _indicator_warmup_bound(self, indicator_configs):
+        """
+        Get an upper bound on the number of warmup rows the indicators leave as NaN
+        
+        Args:
+            indicator_configs (list): Indicator conditions added to the data
+            
+        Returns:
+            int or None: Warmup bound, or None if an indicator has no configured period
+        """
+        bound = 0
+        for config in indicator_configs:
+            params = config.get('params') or {}
+            periods = [
+                value for name, value in params.items()
+                if name.lower().endswith('period') and isinstance(value, (int, float)) and not isinstance(value, bool)
+            ]
+            if not periods:
+                return None
+            # Stacked periods (e.g. MACD slow + signal) add up, so the sum bounds the lookback
+            bound = max(bound, int(sum(periods)))
+        return bound
+    
     def _validate_data_structure(self, data):
         """
         Validate the structure of the DataFrame to ensure it's suitable for backtesting
@@ -836,11 +948,6 @@ class BacktestEngine:
         Returns:
             backtrader.feeds.PandasData: Backtrader data feed
         """
-        # Save data to temporary file for Backtrader
-        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as tmp:
-            data.to_csv(tmp.name)
-            tmp_path = tmp.name
-        
         # Ensure all column names are strings
         data.columns = [str(col) for col in data.columns]
         
@@ -850,19 +957,14 @@ class BacktestEngine:
             # Skip standard OHLCV columns 
             if column not in ['open', 'high', 'low', 'close', 'volume']:
                 # Ensure column name is a valid Python identifier
-                col_name = str(column)
-                # Replace any invalid characters with underscore
-                col_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in col_name)
-                # Ensure it starts with a letter or underscore
-                if not col_name[0].isalpha() and col_name[0] != '_':
-                    col_name = 'ind_' + col_name
-                
-                self.logger.debug(f"Adding indicator column: {column} as {col_name}")
+                col_name = _safe_line_name(column)
+                
+                self.logger.debug("Adding indicator column: %s as %s", column, col_name)
                 indicator_columns.append((col_name, column))
         
         self.logger.info(f"Identified {len(indicator_columns)} indicator columns to add to data feed")
-        if indicator_columns:
-            self.logger.debug(f"Indicator mappings: {dict(indicator_columns)}")
+        if indicator_columns and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Indicator mappings: %s", dict(indicator_columns))
         
         # Create a class that properly inherits from PandasData and defines lines correctly
         # This is the key fix: properly setting up line definitions for backtrader
@@ -895,9 +997,6 @@ class BacktestEngine:
         # Create the data feed instance
         feed = CustomPandasData(dataname=data)
         
-        # Clean up temporary file
-        os.unlink(tmp_path)
-        
         return feed
 
 # Example usage:
@@ -167,10 +167,9 @@ class Optimizer:
             return [self._ensure_serializable(item) for item in obj]
         elif isinstance(obj, tuple):
             return [self._ensure_serializable(item) for item in obj]
-        elif isinstance(obj, (np.int64, np.int32, np.int16, np.int8)):
-            return int(obj)
-        elif isinstance(obj, (np.float64, np.float32, np.float16)):
-            return float(obj)
+        elif isinstance(obj, np.generic):
+            # Any numpy scalar (ints, floats, bools, ...) converts to the matching Python type
+            return obj.item()
         elif isinstance(obj, np.ndarray):
             return self._ensure_serializable(obj.tolist())
         elif hasattr(obj, 'tolist'):
@@ -447,13 +446,13 @@ class Optimizer:
                     'objective_value': objective_value
                 }
                 
-                self.optimizations[optimization_id]['iteration_results'].append(iteration_result)
-                
-                # Update best result if applicable
+                # Update best result if applicable (before appending, so a new iteration count implies current best values)
                 if self.optimizations[optimization_id]['best_result'] is None or objective_value < self.optimizations[optimization_id]['best_result']:
                     self.optimizations[optimization_id]['best_params'] = params
                     self.optimizations[optimization_id]['best_result'] = objective_value
                 
+                self.optimizations[optimization_id]['iteration_results'].append(iteration_result)
+                
                 return objective_value
             
             except Exception as e:
@@ -529,9 +528,7 @@ class Optimizer:
                         improvement = ((optimized - original) / abs(original)) * 100 if original != 0 else 0
                         self.logger.info(f"  {param['name']}: Original={original:.4f}, Optimized={optimized:.4f}, Change={improvement:.2f}%")
             
-            # Update optimization status
-            self.optimizations[optimization_id]['status'] = 'completed'
-            self.optimizations[optimization_id]['progress'] = 100
+            # Update optimization status; status flips to completed last so pollers never see a half-filled result
             self.optimizations[optimization_id]['best_params'] = best_params
             self.optimizations[optimization_id]['best_result'] = -result.fun
             self.optimizations[optimization_id]['best_backtest'] = best_backtest
@@ -540,6 +537,8 @@ class Optimizer:
                 'original': original_summary,
                 'optimized': optimized_summary
             }
+            self.optimizations[optimization_id]['progress'] = 100
+            self.optimizations[optimization_id]['status'] = 'completed'
             
             # Add detailed logging for the comparison data
             self.logger.info(f"Optimization completed: {optimization_id}")
@@ -1,5 +1,6 @@
 
 import json
+import orjson
 import os
 import uuid
 import logging
@@ -37,8 +38,9 @@ class StrategyManager:
             
             # Add metadata
             strategy_data['strategy_id'] = strategy_id
-            strategy_data['created_at'] = datetime.now().isoformat()
-            strategy_data['updated_at'] = datetime.now().isoformat()
+            now = datetime.now().isoformat()
+            strategy_data['created_at'] = now
+            strategy_data['updated_at'] = now
             
             # Save strategy to file
             self._save_strategy_to_file(strategy_id, strategy_data)
@@ -242,15 +244,15 @@ class StrategyManager:
             backtest_results['strategy_id'] = strategy_id
             backtest_results['created_at'] = datetime.now().isoformat()
             
-            # Create backtests directory if it doesn't exist
+            # Create backtests directory if it doesn't exist (exist_ok avoids a separate stat per save)
             backtests_dir = os.path.join(self.storage_dir, strategy_id, 'backtests')
-            if not os.path.exists(backtests_dir):
-                os.makedirs(backtests_dir)
+            os.makedirs(backtests_dir, exist_ok=True)
             
             # Save backtest results to file
             backtest_path = os.path.join(backtests_dir, f"{backtest_id}.json")
-            with open(backtest_path, 'w') as f:
-                json.dump(backtest_results, f, indent=2)
+            # orjson writes the numpy equity/returns series without converting them to lists first
+            with open(backtest_path, 'wb') as f:
+                f.write(orjson.dumps(backtest_results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
             
             self.logger.info(f"Saved backtest results with ID: {backtest_id} for strategy: {strategy_id}")
             return backtest_id
@@ -290,6 +292,21 @@ class StrategyManager:
             self.logger.error(f"Error getting backtest results: {str(e)}")
             raise
     
+    def get_strategy_with_backtest(self, strategy_id, backtest_id):
+        """
+        Get a strategy and one of its backtest results in a single call
+        
+        Args:
+            strategy_id (str): Strategy ID
+            backtest_id (str): Backtest ID
+            
+        Returns:
+            tuple: (strategy data, backtest results)
+        """
+        strategy_data = self.get_strategy(strategy_id)
+        backtest_results = self.get_backtest_results(strategy_id, backtest_id)
+        return strategy_data, backtest_results
+    
     def save_optimization_results(self, strategy_id, optimization_results):
         """
         Save optimization results for a strategy
@@ -314,15 +331,14 @@ class StrategyManager:
             optimization_results['strategy_id'] = strategy_id
             optimization_results['created_at'] = datetime.now().isoformat()
             
-            # Create optimizations directory if it doesn't exist
+            # Create optimizations directory if it doesn't exist (exist_ok avoids a separate stat per save)
             optimizations_dir = os.path.join(self.storage_dir, strategy_id, 'optimizations')
-            if not os.path.exists(optimizations_dir):
-                os.makedirs(optimizations_dir)
+            os.makedirs(optimizations_dir, exist_ok=True)
             
             # Save optimization results to file
             optimization_path = os.path.join(optimizations_dir, f"{optimization_id}.json")
-            with open(optimization_path, 'w') as f:
-                json.dump(optimization_results, f, indent=2)
+            with open(optimization_path, 'wb') as f:
+                f.write(orjson.dumps(optimization_results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
             
             self.logger.info(f"Saved optimization results with ID: {optimization_id} for strategy: {strategy_id}")
             return optimization_id
@@ -437,14 +453,9 @@ class StrategyManager:
             strategy_id (str): Strategy ID
             strategy_data (dict): Strategy data
         """
-        # Create strategies directory if it doesn't exist
-        if not os.path.exists(self.storage_dir):
-            os.makedirs(self.storage_dir)
-        
-        # Create strategy directory if it doesn't exist
+        # Create strategy directory (and the strategies directory above it) if it doesn't exist
         strategy_dir = os.path.join(self.storage_dir, strategy_id)
-        if not os.path.exists(strategy_dir):
-            os.makedirs(strategy_dir)
+        os.makedirs(strategy_dir, exist_ok=True)
         
         # Save strategy to file
         strategy_path = os.path.join(self.storage_dir, f"{strategy_id}.json")
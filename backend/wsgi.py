@@ -0,0 +1,4 @@
+# WSGI entry point for running the backend under a production server, e.g.
+#   gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:3001 wsgi:application
+# Optimization state lives in memory in this process, so use a single worker and scale with threads.
+from app import app as application